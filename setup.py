@@ -1,3 +1,4 @@
+import numpy
 from setuptools import setup
 from pybind11.setup_helpers import Pybind11Extension, build_ext
 
@@ -15,6 +16,7 @@ ext_modules = [
             "sophuspy",
             "sophuspy/include/original",
             "sophuspy/include/extension",
+            numpy.get_include(),
         ],
         language='c++',
         # Example: passing in the version to the compiled code
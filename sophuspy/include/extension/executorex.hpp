@@ -0,0 +1,152 @@
+#ifndef SOPHUS_EXECUTOR_EXTENSION_HPP
+#define SOPHUS_EXECUTOR_EXTENSION_HPP
+
+#include <algorithm>
+#include <condition_variable>
+#include <deque>
+#include <functional>
+#include <mutex>
+#include <stdexcept>
+#include <thread>
+#include <vector>
+
+namespace Sophus
+{
+/** @brief Fixed size pool of native worker threads fed by a bounded queue.
+
+Producers calling submit() block while the queue is full, so a burst of
+requests is throttled instead of growing the queue without limit.
+Tasks must not throw.
+ */
+class ThreadPool
+{
+public:
+	/** @brief Start the worker threads
+
+	@param nWorkers number of worker threads, 0 for hardware concurrency
+	       nQueue maximum number of queued tasks, 0 for 4 * nWorkers
+	 */
+	explicit ThreadPool(size_t nWorkers = 0, size_t nQueue = 0)
+	{
+		if (0 == nWorkers)
+		{
+			nWorkers = std::max<size_t>(1, std::thread::hardware_concurrency());
+		}
+		mMaxWorkers = nWorkers;
+		mMaxQueueSize = (0 == nQueue) ? 4 * nWorkers : nQueue;
+
+		mWorkers.reserve(mMaxWorkers);
+		for (size_t i = 0; i < mMaxWorkers; ++i)
+		{
+			mWorkers.emplace_back([this] { workerLoop(); });
+		}
+	}
+
+	ThreadPool(const ThreadPool &) = delete;
+	ThreadPool &operator=(const ThreadPool &) = delete;
+
+	~ThreadPool() { shutdown(); }
+
+	/** @brief Enqueue a task
+
+	@param task callable run once on a worker thread
+	       block wait for a free slot if the queue is full
+
+	@return bool false if the queue is full and block is false
+	 */
+	bool submit(std::function<void()> task, const bool block = true)
+	{
+		std::unique_lock<std::mutex> lock(mMutex);
+		if (block)
+		{
+			mNotFull.wait(lock, [this] { return mStopped || mTasks.size() < mMaxQueueSize; });
+		}
+		if (mStopped)
+		{
+			throw std::runtime_error("cannot submit to an executor after shutdown");
+		}
+		if (mTasks.size() >= mMaxQueueSize)
+		{
+			return false;
+		}
+		mTasks.push_back(std::move(task));
+		mNotEmpty.notify_one();
+		return true;
+	}
+
+	/** @brief Stop accepting tasks, run the queued ones and join the workers
+
+	@return void
+	 */
+	void shutdown()
+	{
+		{
+			std::lock_guard<std::mutex> lock(mMutex);
+			mStopped = true;
+		}
+		mNotEmpty.notify_all();
+		mNotFull.notify_all();
+
+		for (std::thread &worker : mWorkers)
+		{
+			// a task may shut down its own pool, that worker exits once the task returns
+			if (worker.joinable() && worker.get_id() != std::this_thread::get_id())
+			{
+				worker.join();
+			}
+		}
+	}
+
+	/** @brief Whether the calling thread is one of the workers
+
+	@return bool
+	 */
+	bool isWorkerThread() const
+	{
+		for (const std::thread &worker : mWorkers)
+		{
+			if (worker.get_id() == std::this_thread::get_id())
+			{
+				return true;
+			}
+		}
+		return false;
+	}
+
+	size_t maxWorkers() const { return mMaxWorkers; }
+
+	size_t maxQueueSize() const { return mMaxQueueSize; }
+
+private:
+	void workerLoop()
+	{
+		for (;;)
+		{
+			std::function<void()> task;
+			{
+				std::unique_lock<std::mutex> lock(mMutex);
+				mNotEmpty.wait(lock, [this] { return mStopped || !mTasks.empty(); });
+				if (mTasks.empty())
+				{
+					return;
+				}
+				task = std::move(mTasks.front());
+				mTasks.pop_front();
+			}
+			mNotFull.notify_one();
+			task();
+		}
+	}
+
+	size_t mMaxWorkers;
+	size_t mMaxQueueSize;
+	bool mStopped = false;
+	std::deque<std::function<void()>> mTasks;
+	std::vector<std::thread> mWorkers;
+	std::mutex mMutex;
+	std::condition_variable mNotEmpty;
+	std::condition_variable mNotFull;
+};
+} // namespace Sophus
+
+#endif
@@ -0,0 +1,395 @@
+#ifndef SOPHUS_TREE_EXTENSION_HPP
+#define SOPHUS_TREE_EXTENSION_HPP
+
+#include <algorithm>
+#include <cmath>
+#include <deque>
+#include <stdexcept>
+#include <string>
+#include <unordered_map>
+#include <unordered_set>
+#include <utility>
+#include <vector>
+#include "se3.hpp"
+#include "eigenex.hpp"
+
+namespace Sophus
+{
+/** @brief Interpolate between two poses on the manifold
+
+@param T0, T1 SE3d
+       s ratio in [0, 1], 0 gives T0 and 1 gives T1
+
+@return SE3d
+ */
+SE3d interpolateSE3(const SE3d &T0, const SE3d &T1, const double s)
+{
+	return T0 * SE3d::exp(s * (T0.inverse() * T1).log());
+}
+
+/** @brief Tree of named frames, each edge holds the pose of a frame in its parent T_parent_child.
+
+An edge is either static or a buffer of time stamped poses. Lookups without a time use the
+static or latest pose of each edge and are served from a cache of root relative poses,
+updating an edge only invalidates the cache of its subtree. Lookups at a time interpolate
+the buffered edges between the two frames and their lowest common ancestor.
+ */
+class TransformTree
+{
+public:
+	/** @param bufferSize maximum number of poses kept per time stamped edge */
+	explicit TransformTree(const size_t bufferSize = 100) : mBufferSize(std::max<size_t>(1, bufferSize)) {}
+
+	/** @brief Set the static pose of frame in parent, frames are created if needed
+
+	@param frame child frame
+	       parent parent frame
+	       T pose of frame in parent
+
+	@return void
+	 */
+	void setTransform(const std::string &frame, const std::string &parent, const SE3d &T)
+	{
+		Frame &f = mFrames[link(frame, parent)];
+		f.buffer.clear();
+		f.stamped = false;
+		f.T = T;
+		invalidate(id(frame));
+	}
+
+	/** @brief Add a time stamped pose of frame in parent, a static pose of the edge is dropped.
+			   A pose with an existing stamp is replaced, the oldest is dropped if the buffer is full.
+
+	@param frame child frame
+	       parent parent frame
+	       T pose of frame in parent
+	       stamp time of the pose
+
+	@return void
+	 */
+	void setTransform(const std::string &frame, const std::string &parent, const SE3d &T, const double stamp)
+	{
+		checkStamp(stamp);
+		const int i = link(frame, parent);
+		Frame &f = mFrames[i];
+		if (!f.stamped)
+		{
+			f.buffer.clear();
+			f.stamped = true;
+		}
+
+		auto it = std::lower_bound(f.buffer.begin(), f.buffer.end(), stamp,
+			[](const Sample &sample, const double t) { return sample.first < t; });
+		if (it != f.buffer.end() && it->first == stamp)
+		{
+			it->second = T;
+		}
+		else
+		{
+			f.buffer.insert(it, Sample(stamp, T));
+		}
+		if (f.buffer.size() > mBufferSize)
+		{
+			f.buffer.pop_front();
+		}
+
+		// only the latest pose is cached
+		if (stamp >= f.buffer.back().first)
+		{
+			f.T = f.buffer.back().second;
+			invalidate(i);
+		}
+	}
+
+	/** @brief Pose of source in target, i.e. transforms points from source to target
+
+	@param target, source frame names
+
+	@return SE3d T_target_source
+	 */
+	SE3d lookup(const std::string &target, const std::string &source)
+	{
+		const int a = id(target);
+		const int b = id(source);
+		const Frame &fa = rootPose(a);
+		const Frame &fb = rootPose(b);
+		if (fa.root != fb.root)
+		{
+			throw std::invalid_argument("frames '" + target + "' and '" + source + "' are not connected");
+		}
+		return fa.rootT.inverse() * fb.rootT;
+	}
+
+	/** @brief Pose of source in target at time stamp, see lookup
+
+	@param target, source frame names
+	       stamp time, must be inside the buffer of every time stamped edge between the frames
+
+	@return SE3d T_target_source
+	 */
+	SE3d lookup(const std::string &target, const std::string &source, const double stamp)
+	{
+		checkStamp(stamp);
+		const int a = id(target);
+		const int b = id(source);
+
+		std::unordered_set<int> ancestors;
+		for (int i = a; i >= 0; i = mFrames[i].parent)
+		{
+			ancestors.insert(i);
+		}
+		int lca = b;
+		while (lca >= 0 && 0 == ancestors.count(lca))
+		{
+			lca = mFrames[lca].parent;
+		}
+		if (lca < 0)
+		{
+			throw std::invalid_argument("frames '" + target + "' and '" + source + "' are not connected");
+		}
+		return poseInAncestor(a, lca, stamp).inverse() * poseInAncestor(b, lca, stamp);
+	}
+
+	/** @brief Batch lookup of frame pairs, see lookup
+
+	@param targets, sources frame names of the same length N
+
+	@return PosesXd (N, 12) matrix, each row is a 3 * 4 transform. Row order
+	 */
+	Eigen::PosesXd lookupPoses(const std::vector<std::string> &targets, const std::vector<std::string> &sources)
+	{
+		return lookupPoses(targets, sources, [this](const std::string &a, const std::string &b) { return lookup(a, b); });
+	}
+
+	Eigen::PosesXd lookupPoses(const std::vector<std::string> &targets, const std::vector<std::string> &sources,
+							   const double stamp)
+	{
+		checkStamp(stamp);
+		return lookupPoses(targets, sources,
+						   [this, stamp](const std::string &a, const std::string &b) { return lookup(a, b, stamp); });
+	}
+
+	bool hasFrame(const std::string &frame) const { return mIds.count(frame) > 0; }
+
+	/** @brief Name of the parent frame, empty for a root frame */
+	std::string parent(const std::string &frame) const
+	{
+		const int p = mFrames[id(frame)].parent;
+		return p < 0 ? std::string() : mFrames[p].name;
+	}
+
+	std::vector<std::string> frames() const
+	{
+		std::vector<std::string> names;
+		names.reserve(mFrames.size());
+		for (const Frame &f : mFrames)
+		{
+			names.push_back(f.name);
+		}
+		return names;
+	}
+
+	size_t size() const { return mFrames.size(); }
+
+	size_t bufferSize() const { return mBufferSize; }
+
+private:
+	typedef std::pair<double, SE3d> Sample;
+
+	struct Frame
+	{
+		std::string name;
+		int parent = -1;
+		std::vector<int> children;
+
+		// static or latest pose in parent, and its time stamped history
+		SE3d T;
+		bool stamped = false;
+		std::deque<Sample> buffer;
+
+		// cached pose in the root frame, valid only if the parent's one is
+		SE3d rootT;
+		int root = -1;
+		bool valid = false;
+	};
+
+	/** @brief NaN would break the order of the buffers and every comparison against them */
+	static void checkStamp(const double stamp)
+	{
+		if (!std::isfinite(stamp))
+		{
+			throw std::invalid_argument("time " + std::to_string(stamp) + " is not finite");
+		}
+	}
+
+	int id(const std::string &frame) const
+	{
+		auto it = mIds.find(frame);
+		if (it == mIds.end())
+		{
+			throw std::invalid_argument("unknown frame '" + frame + "'");
+		}
+		return it->second;
+	}
+
+	int getOrCreate(const std::string &frame)
+	{
+		auto it = mIds.find(frame);
+		if (it != mIds.end())
+		{
+			return it->second;
+		}
+		Frame f;
+		f.name = frame;
+		mFrames.push_back(f);
+		mIds[frame] = static_cast<int>(mFrames.size()) - 1;
+		return mIds[frame];
+	}
+
+	/** @brief Make parent the parent of frame, returns the id of frame */
+	int link(const std::string &frame, const std::string &parent)
+	{
+		if (frame == parent)
+		{
+			throw std::invalid_argument("frame '" + frame + "' can not be its own parent");
+		}
+		const int c = getOrCreate(frame);
+		const int p = getOrCreate(parent);
+		// updating the pose of an existing edge
+		if (mFrames[c].parent == p)
+		{
+			return c;
+		}
+
+		// only a frame with children can be an ancestor of parent
+		for (int i = p; i >= 0 && !mFrames[c].children.empty(); i = mFrames[i].parent)
+		{
+			if (i == c)
+			{
+				throw std::invalid_argument("setting '" + parent + "' as parent of '" + frame + "' creates a cycle");
+			}
+		}
+
+		// reparent, the edge to the old parent is dropped
+		Frame &f = mFrames[c];
+		if (f.parent >= 0)
+		{
+			std::vector<int> &siblings = mFrames[f.parent].children;
+			siblings.erase(std::find(siblings.begin(), siblings.end(), c));
+		}
+		f.parent = p;
+		f.buffer.clear();
+		f.stamped = false;
+		mFrames[p].children.push_back(c);
+		return c;
+	}
+
+	void invalidate(const int i)
+	{
+		std::vector<int> stack(1, i);
+		while (!stack.empty())
+		{
+			Frame &f = mFrames[stack.back()];
+			stack.pop_back();
+			// an invalid frame has an invalid subtree already
+			if (!f.valid)
+			{
+				continue;
+			}
+			f.valid = false;
+			stack.insert(stack.end(), f.children.begin(), f.children.end());
+		}
+	}
+
+	/** @brief Cached pose of frame i in its root, iterative as chains can be deep */
+	const Frame &rootPose(const int i)
+	{
+		// walk up to the first valid ancestor, then compose back down
+		std::vector<int> chain;
+		for (int j = i; j >= 0 && !mFrames[j].valid; j = mFrames[j].parent)
+		{
+			chain.push_back(j);
+		}
+		for (auto it = chain.rbegin(); it != chain.rend(); ++it)
+		{
+			Frame &f = mFrames[*it];
+			if (f.parent < 0)
+			{
+				f.rootT = SE3d();
+				f.root = *it;
+			}
+			else
+			{
+				const Frame &p = mFrames[f.parent];
+				f.rootT = p.rootT * f.T;
+				f.root = p.root;
+			}
+			f.valid = true;
+		}
+		return mFrames[i];
+	}
+
+	/** @brief Pose of edge i in its parent at time stamp, static edges ignore the stamp */
+	SE3d edgePose(const int i, const double stamp) const
+	{
+		const Frame &f = mFrames[i];
+		if (!f.stamped)
+		{
+			return f.T;
+		}
+
+		const std::deque<Sample> &buffer = f.buffer;
+		if (stamp < buffer.front().first || stamp > buffer.back().first)
+		{
+			throw std::invalid_argument("time " + std::to_string(stamp) + " is outside the buffer of '" + f.name +
+										"' [" + std::to_string(buffer.front().first) + ", " +
+										std::to_string(buffer.back().first) + "]");
+		}
+		auto it = std::lower_bound(buffer.begin(), buffer.end(), stamp,
+			[](const Sample &sample, const double t) { return sample.first < t; });
+		if (it->first == stamp)
+		{
+			return it->second;
+		}
+		const Sample &s0 = *(it - 1);
+		const Sample &s1 = *it;
+		return interpolateSE3(s0.second, s1.second, (stamp - s0.first) / (s1.first - s0.first));
+	}
+
+	SE3d poseInAncestor(int i, const int ancestor, const double stamp) const
+	{
+		SE3d T;
+		for (; i != ancestor; i = mFrames[i].parent)
+		{
+			T = edgePose(i, stamp) * T;
+		}
+		return T;
+	}
+
+	template <typename Lookup>
+	Eigen::PosesXd lookupPoses(const std::vector<std::string> &targets, const std::vector<std::string> &sources,
+							   Lookup lookupPair)
+	{
+		if (targets.size() != sources.size())
+		{
+			throw std::invalid_argument("targets and sources must have the same length");
+		}
+
+		const int n = static_cast<int>(targets.size());
+		Eigen::PosesXd poses(n, 12);
+		Eigen::RowPose34d pose;
+		for (int i = 0; i < n; ++i)
+		{
+			pose = lookupPair(targets[i], sources[i]).matrix3x4();
+			poses.row(i) = Eigen::MapRowVector12d(pose.data(), 12);
+		}
+		return poses;
+	}
+
+	size_t mBufferSize;
+	std::vector<Frame> mFrames;
+	std::unordered_map<std::string, int> mIds;
+};
+} // namespace Sophus
+
+#endif
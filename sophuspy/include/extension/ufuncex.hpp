@@ -0,0 +1,239 @@
+#ifndef SOPHUS_UFUNC_EXTENSION_HPP
+#define SOPHUS_UFUNC_EXTENSION_HPP
+
+#include <cmath>
+#include <limits>
+#include "so2.hpp"
+#include "se2.hpp"
+#include "so3.hpp"
+#include "se3.hpp"
+#include "eigenex.hpp"
+
+namespace Sophus
+{
+/** @brief Compose two rotation matrices
+
+@param a, b Eigen::Matrix<double, D, D>
+
+@return a * b
+ */
+template <int D>
+Eigen::Matrix<double, D, D> rotationCompose(const Eigen::Matrix<double, D, D> &a, const Eigen::Matrix<double, D, D> &b)
+{
+	return a * b;
+}
+
+/** @brief Rotate a point
+
+@param R Eigen::Matrix<double, D, D>
+       pt Eigen::Matrix<double, D, 1>
+
+@return R * pt
+ */
+template <int D>
+Eigen::Matrix<double, D, 1> rotationAct(const Eigen::Matrix<double, D, D> &R, const Eigen::Matrix<double, D, 1> &pt)
+{
+	return R * pt;
+}
+
+/** @brief Inverse a rotation matrix
+
+@param R Eigen::Matrix<double, D, D>
+
+@return transpose of R
+ */
+template <int D>
+Eigen::Matrix<double, D, D> rotationInverse(const Eigen::Matrix<double, D, D> &R)
+{
+	return R.transpose();
+}
+
+/** @brief Compose two rigid transforms, only the top D rows of each are read
+
+@param a, b Eigen::Matrix<double, D + 1, D + 1> homogeneous transforms
+
+@return a * b
+ */
+template <int D>
+Eigen::Matrix<double, D + 1, D + 1> rigidCompose(const Eigen::Matrix<double, D + 1, D + 1> &a,
+                                                 const Eigen::Matrix<double, D + 1, D + 1> &b)
+{
+	Eigen::Matrix<double, D + 1, D + 1> out;
+	out.template topLeftCorner<D, D>() = a.template topLeftCorner<D, D>() * b.template topLeftCorner<D, D>();
+	out.template topRightCorner<D, 1>() =
+		a.template topLeftCorner<D, D>() * b.template topRightCorner<D, 1>() + a.template topRightCorner<D, 1>();
+	out.row(D).setZero();
+	out(D, D) = 1.;
+	return out;
+}
+
+/** @brief Transform a point by a rigid transform
+
+@param T Eigen::Matrix<double, D + 1, D + 1> homogeneous transform
+       pt Eigen::Matrix<double, D, 1>
+
+@return R * pt + t
+ */
+template <int D>
+Eigen::Matrix<double, D, 1> rigidAct(const Eigen::Matrix<double, D + 1, D + 1> &T, const Eigen::Matrix<double, D, 1> &pt)
+{
+	return T.template topLeftCorner<D, D>() * pt + T.template topRightCorner<D, 1>();
+}
+
+/** @brief Inverse a rigid transform
+
+@param T Eigen::Matrix<double, D + 1, D + 1> homogeneous transform
+
+@return [R^T, -R^T * t]
+ */
+template <int D>
+Eigen::Matrix<double, D + 1, D + 1> rigidInverse(const Eigen::Matrix<double, D + 1, D + 1> &T)
+{
+	Eigen::Matrix<double, D + 1, D + 1> out;
+	out.template topLeftCorner<D, D>() = T.template topLeftCorner<D, D>().transpose();
+	out.template topRightCorner<D, 1>() = -out.template topLeftCorner<D, D>() * T.template topRightCorner<D, 1>();
+	out.row(D).setZero();
+	out(D, D) = 1.;
+	return out;
+}
+
+/** @brief Check a rotation matrix without aborting like the Sophus constructors.
+		   The tolerance is looser than theirs so float32 input still passes
+
+@param R Eigen::Matrix<double, D, D>
+
+@return bool true if R is finite, orthogonal and its determinant is positive
+ */
+template <int D>
+bool isRotationMatrix(const Eigen::Matrix<double, D, D> &R)
+{
+	// written so that NaN fails every comparison
+	return (R * R.transpose() - Eigen::Matrix<double, D, D>::Identity()).norm() < Constants<double>::epsilonSqrt() &&
+		   R.determinant() > 0.;
+}
+
+/** @brief Lie algebra log of a 2d rotation matrix, NaN if R is not a rotation matrix
+
+@param R Eigen::Matrix2d
+
+@return double rotation angle
+ */
+double so2Log(const Eigen::Matrix2d &R)
+{
+	if (!isRotationMatrix<2>(R))
+	{
+		return std::numeric_limits<double>::quiet_NaN();
+	}
+	return SO2d(R(0, 0) + R(1, 1), R(1, 0) - R(0, 1)).log();
+}
+
+/** @brief Exponential map of a rotation angle, NaN if theta is not finite
+
+@param theta double
+
+@return Eigen::Matrix2d
+ */
+Eigen::Matrix2d so2Exp(const double &theta)
+{
+	if (!std::isfinite(theta))
+	{
+		return Eigen::Matrix2d::Constant(std::numeric_limits<double>::quiet_NaN());
+	}
+	return SO2d::exp(theta).matrix();
+}
+
+/** @brief Lie algebra log of a 3x3 rigid transform, NaN if its rotation is not a rotation matrix
+
+@param T Eigen::Matrix3d
+
+@return Eigen::Vector3d [t', theta]
+ */
+Eigen::Vector3d se2Log(const Eigen::Matrix3d &T)
+{
+	const Eigen::Matrix2d R = T.topLeftCorner<2, 2>();
+	if (!isRotationMatrix<2>(R))
+	{
+		return Eigen::Vector3d::Constant(std::numeric_limits<double>::quiet_NaN());
+	}
+	return SE2d(SO2d(R(0, 0) + R(1, 1), R(1, 0) - R(0, 1)), T.topRightCorner<2, 1>()).log();
+}
+
+/** @brief Exponential map of a se2 element, NaN if xi is not finite
+
+@param xi Eigen::Vector3d [t', theta]
+
+@return Eigen::Matrix3d
+ */
+Eigen::Matrix3d se2Exp(const Eigen::Vector3d &xi)
+{
+	if (!xi.allFinite())
+	{
+		return Eigen::Matrix3d::Constant(std::numeric_limits<double>::quiet_NaN());
+	}
+	return SE2d::exp(xi).matrix();
+}
+
+/** @brief Lie algebra log of a 3d rotation matrix, NaN if R is not a rotation matrix
+
+@param R Eigen::Matrix3d
+
+@return Eigen::Vector3d rotation vector
+ */
+Eigen::Vector3d so3Log(const Eigen::Matrix3d &R)
+{
+	if (!isRotationMatrix<3>(R))
+	{
+		return Eigen::Vector3d::Constant(std::numeric_limits<double>::quiet_NaN());
+	}
+	return SO3d(Eigen::Quaterniond(R)).log();
+}
+
+/** @brief Exponential map of a rotation vector, NaN where the Sophus one would abort,
+		   i.e. if omega or theta^2 is not finite
+
+@param omega Eigen::Vector3d
+
+@return Eigen::Matrix3d
+ */
+Eigen::Matrix3d so3Exp(const Eigen::Vector3d &omega)
+{
+	if (!std::isfinite(omega.squaredNorm()))
+	{
+		return Eigen::Matrix3d::Constant(std::numeric_limits<double>::quiet_NaN());
+	}
+	return SO3d::exp(omega).matrix();
+}
+
+/** @brief Lie algebra log of a 4x4 rigid transform, NaN if its rotation is not a rotation matrix
+
+@param T Eigen::Matrix4d
+
+@return Vector6d [t', omega']
+ */
+Vector6d se3Log(const Eigen::Matrix4d &T)
+{
+	const Eigen::Matrix3d R = T.topLeftCorner<3, 3>();
+	if (!isRotationMatrix<3>(R))
+	{
+		return Vector6d::Constant(std::numeric_limits<double>::quiet_NaN());
+	}
+	return SE3d(SO3d(Eigen::Quaterniond(R)), T.topRightCorner<3, 1>()).log();
+}
+
+/** @brief Exponential map of a se3 element, NaN if xi or theta^2 is not finite, see so3Exp
+
+@param xi Vector6d [t', omega']
+
+@return Eigen::Matrix4d
+ */
+Eigen::Matrix4d se3Exp(const Vector6d &xi)
+{
+	if (!xi.allFinite() || !std::isfinite(xi.tail<3>().squaredNorm()))
+	{
+		return Eigen::Matrix4d::Constant(std::numeric_limits<double>::quiet_NaN());
+	}
+	return SE3d::exp(xi).matrix();
+}
+} // namespace Sophus
+
+#endif
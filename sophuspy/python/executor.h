@@ -0,0 +1,244 @@
+#include <algorithm>
+#include <condition_variable>
+#include <memory>
+#include <mutex>
+#include <thread>
+#include <vector>
+#include <pybind11/pybind11.h>
+#include <pybind11/eigen.h>
+#include "rootex.hpp"
+#include "executorex.hpp"
+
+namespace py = pybind11;
+
+namespace Sophus
+{
+// live pools and the number of pools being deleted off their own workers, both drained at exit
+std::mutex poolsMutex;
+std::condition_variable poolsRetired;
+std::vector<std::weak_ptr<ThreadPool>> livePools;
+size_t nRetiringPools = 0;
+
+/** @brief Release the GIL while a pool is joined, its workers may need it to finish */
+void deleteThreadPool(ThreadPool *pool)
+{
+    // the last reference was dropped by a task, a worker can not join itself
+    if (pool->isWorkerThread())
+    {
+        std::lock_guard<std::mutex> lock(poolsMutex);
+        ++nRetiringPools;
+        std::thread([pool] {
+            delete pool;
+            std::lock_guard<std::mutex> lock(poolsMutex);
+            --nRetiringPools;
+            poolsRetired.notify_all();
+        }).detach();
+        return;
+    }
+
+    if (PyGILState_Check())
+    {
+        py::gil_scoped_release release;
+        delete pool;
+    }
+    else
+    {
+        delete pool;
+    }
+}
+
+std::shared_ptr<ThreadPool> makeThreadPool(size_t nWorkers, size_t nQueue)
+{
+    std::shared_ptr<ThreadPool> pool(new ThreadPool(nWorkers, nQueue), &deleteThreadPool);
+
+    std::lock_guard<std::mutex> lock(poolsMutex);
+    livePools.erase(std::remove_if(livePools.begin(), livePools.end(),
+                                   [](const std::weak_ptr<ThreadPool> &p) { return p.expired(); }),
+                    livePools.end());
+    livePools.push_back(pool);
+    return pool;
+}
+
+/** @brief Run compute on the pool and return a concurrent.futures.Future of its result.
+           The computation runs without the GIL, it is only taken to resolve the future.
+ */
+template <typename Result, typename Compute>
+py::object submitToPool(ThreadPool &pool, Compute compute, const bool block)
+{
+    py::object future = py::module_::import("concurrent.futures").attr("Future")();
+    // the worker drops its reference while holding the GIL, never outside of it
+    auto handle = std::make_shared<py::object>(future);
+
+    auto task = [handle, compute]() {
+        {
+            py::gil_scoped_acquire gil;
+            if (!handle->attr("set_running_or_notify_cancel")().cast<bool>())
+            {
+                *handle = py::object();
+                return;
+            }
+        }
+
+        Result result;
+        std::string error;
+        try
+        {
+            result = compute();
+        }
+        catch (const std::exception &e)
+        {
+            error = e.what();
+        }
+
+        py::gil_scoped_acquire gil;
+        py::object fut = std::move(*handle);
+        if (error.empty())
+        {
+            fut.attr("set_result")(py::cast(std::move(result)));
+        }
+        else
+        {
+            fut.attr("set_exception")(py::reinterpret_borrow<py::object>(PyExc_RuntimeError)(error));
+        }
+    };
+
+    bool accepted = false;
+    {
+        py::gil_scoped_release release;
+        accepted = pool.submit(std::move(task), block);
+    }
+    if (!accepted)
+    {
+        throw std::runtime_error("executor queue is full");
+    }
+    return future;
+}
+
+py::object submitTransformPointsByPoses(ThreadPool &pool, const Eigen::PosesXd &poses, const Eigen::MatrixX3d &points,
+                                        const bool bInv, const bool block)
+{
+    return submitToPool<Eigen::MatrixX3d>(
+        pool, [poses, points, bInv]() { return transformPointsByPoses(poses, points, bInv); }, block);
+}
+
+py::object submitInvertPoses(ThreadPool &pool, const Eigen::PosesXd &poses, const bool block)
+{
+    return submitToPool<Eigen::PosesXd>(pool, [poses]() { return invertPoses(poses); }, block);
+}
+
+py::object submitInvertSinglePose(ThreadPool &pool, const Eigen::Vector12d &pose, const bool block)
+{
+    return submitToPool<Eigen::Vector12d>(pool, [pose]() { return invertSinglePose(pose); }, block);
+}
+
+// pool behind the module level *_async functions, created on first use
+std::mutex defaultPoolMutex;
+std::shared_ptr<ThreadPool> defaultPool;
+
+std::shared_ptr<ThreadPool> getDefaultPool()
+{
+    std::lock_guard<std::mutex> lock(defaultPoolMutex);
+    if (!defaultPool)
+    {
+        defaultPool = makeThreadPool(0, 0);
+    }
+    return defaultPool;
+}
+
+/** @brief Run the tasks left in every pool before the interpreter finalizes, they need the GIL */
+void shutdownPools()
+{
+    std::vector<std::shared_ptr<ThreadPool>> pools;
+    {
+        std::lock_guard<std::mutex> lock(defaultPoolMutex);
+        defaultPool.reset();
+    }
+    {
+        std::lock_guard<std::mutex> lock(poolsMutex);
+        for (const std::weak_ptr<ThreadPool> &p : livePools)
+        {
+            if (std::shared_ptr<ThreadPool> pool = p.lock())
+            {
+                pools.push_back(pool);
+            }
+        }
+    }
+
+    {
+        py::gil_scoped_release release;
+        for (const std::shared_ptr<ThreadPool> &pool : pools)
+        {
+            pool->shutdown();
+        }
+        std::unique_lock<std::mutex> lock(poolsMutex);
+        poolsRetired.wait(lock, [] { return 0 == nRetiringPools; });
+    }
+    // the last references are dropped with the GIL held, the workers are joined already
+}
+
+/** @brief A forked child inherits the pools without their workers, the default one restarts on next use.
+           Joining the parent's workers is undefined, so the inherited pools are leaked.
+ */
+void resetPoolsInChild()
+{
+    new std::shared_ptr<ThreadPool>(std::move(defaultPool));
+    defaultPool.reset();
+    livePools.clear();
+    nRetiringPools = 0;
+}
+
+void declareExecutor(py::module &m)
+{
+    py::class_<ThreadPool, std::shared_ptr<ThreadPool>> cls(m, "Executor",
+        "Native thread pool running batch operations without the GIL. "
+        "Methods return concurrent.futures.Future, use asyncio.wrap_future to await them.");
+
+    // initialization, constructor
+    cls.def(py::init(&makeThreadPool), py::arg("max_workers") = 0, py::arg("max_queue_size") = 0);
+
+    // private functions
+    cls.def("__enter__", [](std::shared_ptr<ThreadPool> self) { return self; });
+    cls.def("__exit__", [](ThreadPool &self, py::args) {
+        py::gil_scoped_release release;
+        self.shutdown();
+    });
+
+    // public functions
+    cls.def("transform_points_by_poses",
+            &submitTransformPointsByPoses,
+            "Submit transform_points_by_poses, returns a Future. Blocks while the queue is full unless block is False",
+            py::arg("poses"), py::arg("points"), py::arg("need_inverse") = false, py::arg("block") = true);
+    cls.def("invert_poses", &submitInvertSinglePose, "Submit invert_poses, returns a Future", py::arg("pose"), py::arg("block") = true);
+    cls.def("invert_poses", &submitInvertPoses, "Submit invert_poses, returns a Future", py::arg("poses"), py::arg("block") = true);
+    cls.def("shutdown", &ThreadPool::shutdown, "Run the queued tasks and stop the workers",
+            py::call_guard<py::gil_scoped_release>());
+    cls.def_property_readonly("max_workers", &ThreadPool::maxWorkers);
+    cls.def_property_readonly("max_queue_size", &ThreadPool::maxQueueSize);
+
+    m.def("transform_points_by_poses_async",
+          [](const Eigen::PosesXd &poses, const Eigen::MatrixX3d &points, const bool bInv, const bool block) {
+              return submitTransformPointsByPoses(*getDefaultPool(), poses, points, bInv, block);
+          },
+          "transform_points_by_poses on the default Executor, returns a Future. "
+          "Blocks the caller while the queue is full, with block False raises RuntimeError instead",
+          py::arg("poses"), py::arg("points"), py::arg("need_inverse") = false, py::arg("block") = true);
+    m.def("invert_poses_async",
+          [](const Eigen::Vector12d &pose, const bool block) { return submitInvertSinglePose(*getDefaultPool(), pose, block); },
+          "invert_poses on the default Executor, returns a Future. "
+          "Blocks the caller while the queue is full, with block False raises RuntimeError instead",
+          py::arg("pose"), py::arg("block") = true);
+    m.def("invert_poses_async",
+          [](const Eigen::PosesXd &poses, const bool block) { return submitInvertPoses(*getDefaultPool(), poses, block); },
+          "invert_poses on the default Executor, returns a Future. "
+          "Blocks the caller while the queue is full, with block False raises RuntimeError instead",
+          py::arg("poses"), py::arg("block") = true);
+
+    // join the workers before the interpreter starts finalizing, restart the default pool in forked children
+    py::module_::import("atexit").attr("register")(py::cpp_function(&shutdownPools));
+    py::module_ os = py::module_::import("os");
+    if (py::hasattr(os, "register_at_fork"))
+    {
+        os.attr("register_at_fork")(py::arg("after_in_child") = py::cpp_function(&resetPoolsInChild));
+    }
+}
+} // end namespace Sophus
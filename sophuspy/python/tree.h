@@ -0,0 +1,50 @@
+#include <pybind11/pybind11.h>
+#include <pybind11/eigen.h>
+#include <pybind11/stl.h>
+#include "treeex.hpp"
+
+namespace py = pybind11;
+
+namespace Sophus
+{
+void declareTransformTree(py::module &m)
+{
+    py::class_<TransformTree> cls(m, "TransformTree");
+
+    // initialization, constructor
+    cls.def(py::init<size_t>(), py::arg("buffer_size") = 100);
+
+    // private functions
+    cls.def("__len__", &TransformTree::size);
+    cls.def("__contains__", &TransformTree::hasFrame);
+
+    // public functions
+    cls.def("set_transform", (void (TransformTree::*)(const std::string &, const std::string &, const SE3d &)) &TransformTree::setTransform,
+            "Set the static pose T_parent_frame, frames are created if needed",
+            py::arg("frame"), py::arg("parent"), py::arg("T"));
+    cls.def("set_transform", (void (TransformTree::*)(const std::string &, const std::string &, const SE3d &, double)) &TransformTree::setTransform,
+            "Add the pose T_parent_frame at time stamp to the buffer of the edge",
+            py::arg("frame"), py::arg("parent"), py::arg("T"), py::arg("stamp"));
+    cls.def("lookup", (SE3d (TransformTree::*)(const std::string &, const std::string &)) &TransformTree::lookup,
+            "Pose T_target_source from cached root relative poses, uses the latest pose of time stamped edges",
+            py::arg("target"), py::arg("source"));
+    cls.def("lookup", (SE3d (TransformTree::*)(const std::string &, const std::string &, double)) &TransformTree::lookup,
+            "Pose T_target_source at time stamp, time stamped edges are interpolated",
+            py::arg("target"), py::arg("source"), py::arg("stamp"));
+    cls.def("lookup_poses",
+            (Eigen::PosesXd (TransformTree::*)(const std::vector<std::string> &, const std::vector<std::string> &)) &TransformTree::lookupPoses,
+            "Batch lookup, returns (N, 12) poses T_target_source in the format of invert_poses",
+            py::arg("targets"), py::arg("sources"));
+    cls.def("lookup_poses",
+            (Eigen::PosesXd (TransformTree::*)(const std::vector<std::string> &, const std::vector<std::string> &, double)) &TransformTree::lookupPoses,
+            "Batch lookup at time stamp, returns (N, 12) poses T_target_source in the format of invert_poses",
+            py::arg("targets"), py::arg("sources"), py::arg("stamp"));
+    cls.def("has_frame", &TransformTree::hasFrame, "Whether frame is in the tree", py::arg("frame"));
+    cls.def("parent", [](TransformTree const &self, const std::string &frame) -> py::object {
+        std::string p = self.parent(frame);
+        return p.empty() ? py::object(py::none()) : py::object(py::str(p));
+    }, "Name of the parent frame, None for a root frame", py::arg("frame"));
+    cls.def("frames", &TransformTree::frames, "Names of all frames");
+    cls.def_property_readonly("buffer_size", &TransformTree::bufferSize);
+}
+} // end namespace Sophus
@@ -0,0 +1,173 @@
+#define NPY_NO_DEPRECATED_API NPY_1_7_API_VERSION
+#include <numpy/arrayobject.h>
+#include <numpy/ufuncobject.h>
+#include <pybind11/pybind11.h>
+#include "ufuncex.hpp"
+
+namespace py = pybind11;
+
+namespace Sophus
+{
+/** @brief Gather / scatter one core element of a gufunc operand from strided memory.
+           Core strides are in bytes, in the order of the core dimensions.
+ */
+template <typename T>
+struct StridedCore;
+
+template <>
+struct StridedCore<double>
+{
+    static constexpr int ndim = 0;
+
+    static double load(const char *p, const npy_intp *) { return *reinterpret_cast<const double *>(p); }
+
+    static void store(char *p, const npy_intp *, const double &value) { *reinterpret_cast<double *>(p) = value; }
+};
+
+template <int Rows, int Cols, int Options, int MaxRows, int MaxCols>
+struct StridedCore<Eigen::Matrix<double, Rows, Cols, Options, MaxRows, MaxCols>>
+{
+    typedef Eigen::Matrix<double, Rows, Cols, Options, MaxRows, MaxCols> Type;
+    static constexpr int ndim = (1 == Cols) ? 1 : 2;
+
+    static Type load(const char *p, const npy_intp *s)
+    {
+        Type value;
+        for (int i = 0; i < Rows; ++i)
+        {
+            for (int j = 0; j < Cols; ++j)
+            {
+                value(i, j) = *reinterpret_cast<const double *>(p + i * s[0] + (2 == ndim ? j * s[1] : 0));
+            }
+        }
+        return value;
+    }
+
+    static void store(char *p, const npy_intp *s, const Type &value)
+    {
+        for (int i = 0; i < Rows; ++i)
+        {
+            for (int j = 0; j < Cols; ++j)
+            {
+                *reinterpret_cast<double *>(p + i * s[0] + (2 == ndim ? j * s[1] : 0)) = value(i, j);
+            }
+        }
+    }
+};
+
+/** @brief gufunc inner loop applying F to each element of the outer loop */
+template <typename Out, typename In, Out (*F)(const In &)>
+void unaryLoop(char **args, npy_intp const *dimensions, npy_intp const *steps, void *)
+{
+    const npy_intp *inSteps = steps + 2;
+    const npy_intp *outSteps = inSteps + StridedCore<In>::ndim;
+    for (npy_intp i = 0; i < dimensions[0]; ++i)
+    {
+        const In in = StridedCore<In>::load(args[0] + i * steps[0], inSteps);
+        StridedCore<Out>::store(args[1] + i * steps[1], outSteps, F(in));
+    }
+}
+
+/** @brief gufunc inner loop applying F to each pair of elements of the outer loop */
+template <typename Out, typename In1, typename In2, Out (*F)(const In1 &, const In2 &)>
+void binaryLoop(char **args, npy_intp const *dimensions, npy_intp const *steps, void *)
+{
+    const npy_intp *in1Steps = steps + 3;
+    const npy_intp *in2Steps = in1Steps + StridedCore<In1>::ndim;
+    const npy_intp *outSteps = in2Steps + StridedCore<In2>::ndim;
+    for (npy_intp i = 0; i < dimensions[0]; ++i)
+    {
+        const In1 in1 = StridedCore<In1>::load(args[0] + i * steps[0], in1Steps);
+        const In2 in2 = StridedCore<In2>::load(args[1] + i * steps[1], in2Steps);
+        StridedCore<Out>::store(args[2] + i * steps[2], outSteps, F(in1, in2));
+    }
+}
+
+/** @brief Create a float64 gufunc and add it to module m */
+void addUfunc(py::module &m, const char *name, const char *signature, const char *doc,
+              PyUFuncGenericFunction loop, const int nin)
+{
+    // numpy keeps these pointers for the lifetime of the ufunc, i.e. of the process
+    static void *data[1] = {nullptr};
+    static const char types[3] = {NPY_DOUBLE, NPY_DOUBLE, NPY_DOUBLE};
+    PyUFuncGenericFunction *funcs = new PyUFuncGenericFunction[1]{loop};
+
+    PyObject *ufunc = PyUFunc_FromFuncAndDataAndSignature(
+        funcs, data, const_cast<char *>(types), 1, nin, 1, PyUFunc_None, name, doc, 0, signature);
+    if (nullptr == ufunc)
+    {
+        throw py::error_already_set();
+    }
+    m.add_object(name, py::reinterpret_steal<py::object>(ufunc));
+}
+
+template <typename Out, typename In, Out (*F)(const In &)>
+void addUnaryUfunc(py::module &m, const char *name, const char *signature, const char *doc)
+{
+    addUfunc(m, name, signature, doc, &unaryLoop<Out, In, F>, 1);
+}
+
+template <typename Out, typename In1, typename In2, Out (*F)(const In1 &, const In2 &)>
+void addBinaryUfunc(py::module &m, const char *name, const char *signature, const char *doc)
+{
+    addUfunc(m, name, signature, doc, &binaryLoop<Out, In1, In2, F>, 2);
+}
+
+void declareUfunc(py::module &m)
+{
+    if (_import_array() < 0 || _import_umath() < 0)
+    {
+        throw py::error_already_set();
+    }
+
+    py::module u = m.def_submodule("ufunc", "NumPy generalized ufuncs of group operations on float64 arrays");
+
+    // SO2
+    addBinaryUfunc<Eigen::Matrix2d, Eigen::Matrix2d, Eigen::Matrix2d, &rotationCompose<2>>(
+        u, "so2_compose", "(2,2),(2,2)->(2,2)", "Compose 2 * 2 rotation matrices");
+    addBinaryUfunc<Eigen::Vector2d, Eigen::Matrix2d, Eigen::Vector2d, &rotationAct<2>>(
+        u, "so2_act", "(2,2),(2)->(2)", "Rotate 2d points");
+    addUnaryUfunc<Eigen::Matrix2d, Eigen::Matrix2d, &rotationInverse<2>>(
+        u, "so2_inverse", "(2,2)->(2,2)", "Inverse of 2 * 2 rotation matrices");
+    addUnaryUfunc<double, Eigen::Matrix2d, &so2Log>(
+        u, "so2_log", "(2,2)->()", "Lie algebra log of 2 * 2 rotation matrices");
+    addUnaryUfunc<Eigen::Matrix2d, double, &so2Exp>(
+        u, "so2_exp", "()->(2,2)", "Exponential map of rotation angles");
+
+    // SE2
+    addBinaryUfunc<Eigen::Matrix3d, Eigen::Matrix3d, Eigen::Matrix3d, &rigidCompose<2>>(
+        u, "se2_compose", "(3,3),(3,3)->(3,3)", "Compose 3 * 3 transforms");
+    addBinaryUfunc<Eigen::Vector2d, Eigen::Matrix3d, Eigen::Vector2d, &rigidAct<2>>(
+        u, "se2_act", "(3,3),(2)->(2)", "Transform 2d points");
+    addUnaryUfunc<Eigen::Matrix3d, Eigen::Matrix3d, &rigidInverse<2>>(
+        u, "se2_inverse", "(3,3)->(3,3)", "Inverse of 3 * 3 transforms");
+    addUnaryUfunc<Eigen::Vector3d, Eigen::Matrix3d, &se2Log>(
+        u, "se2_log", "(3,3)->(3)", "Lie algebra log of 3 * 3 transforms");
+    addUnaryUfunc<Eigen::Matrix3d, Eigen::Vector3d, &se2Exp>(
+        u, "se2_exp", "(3)->(3,3)", "Exponential map of se2 elements");
+
+    // SO3
+    addBinaryUfunc<Eigen::Matrix3d, Eigen::Matrix3d, Eigen::Matrix3d, &rotationCompose<3>>(
+        u, "so3_compose", "(3,3),(3,3)->(3,3)", "Compose 3 * 3 rotation matrices");
+    addBinaryUfunc<Eigen::Vector3d, Eigen::Matrix3d, Eigen::Vector3d, &rotationAct<3>>(
+        u, "so3_act", "(3,3),(3)->(3)", "Rotate 3d points");
+    addUnaryUfunc<Eigen::Matrix3d, Eigen::Matrix3d, &rotationInverse<3>>(
+        u, "so3_inverse", "(3,3)->(3,3)", "Inverse of 3 * 3 rotation matrices");
+    addUnaryUfunc<Eigen::Vector3d, Eigen::Matrix3d, &so3Log>(
+        u, "so3_log", "(3,3)->(3)", "Lie algebra log of 3 * 3 rotation matrices");
+    addUnaryUfunc<Eigen::Matrix3d, Eigen::Vector3d, &so3Exp>(
+        u, "so3_exp", "(3)->(3,3)", "Exponential map of rotation vectors");
+
+    // SE3
+    addBinaryUfunc<Eigen::Matrix4d, Eigen::Matrix4d, Eigen::Matrix4d, &rigidCompose<3>>(
+        u, "se3_compose", "(4,4),(4,4)->(4,4)", "Compose 4 * 4 transforms");
+    addBinaryUfunc<Eigen::Vector3d, Eigen::Matrix4d, Eigen::Vector3d, &rigidAct<3>>(
+        u, "se3_act", "(4,4),(3)->(3)", "Transform 3d points");
+    addUnaryUfunc<Eigen::Matrix4d, Eigen::Matrix4d, &rigidInverse<3>>(
+        u, "se3_inverse", "(4,4)->(4,4)", "Inverse of 4 * 4 transforms");
+    addUnaryUfunc<Vector6d, Eigen::Matrix4d, &se3Log>(
+        u, "se3_log", "(4,4)->(6)", "Lie algebra log of 4 * 4 transforms");
+    addUnaryUfunc<Eigen::Matrix4d, Vector6d, &se3Exp>(
+        u, "se3_exp", "(6)->(4,4)", "Exponential map of se3 elements");
+}
+} // end namespace Sophus
@@ -5,6 +5,9 @@
 #include "python/so3.h"
 #include "python/se2.h"
 #include "python/se3.h"
+#include "python/executor.h"
+#include "python/ufunc.h"
+#include "python/tree.h"
 
 namespace Sophus
 {
@@ -17,5 +20,9 @@ PYBIND11_MODULE(sophuspy, m)
 
 	declareSO3(m);
 	declareSE3(m);
+
+	declareExecutor(m);
+	declareUfunc(m);
+	declareTransformTree(m);
 }
 } // end namespace Sophus
\ No newline at end of file
@@ -0,0 +1,127 @@
+import asyncio
+import concurrent.futures
+import os
+import subprocess
+import sys
+import textwrap
+import numpy as np
+import unittest
+import pytest
+
+import sophuspy as sp
+
+
+class TestExecutor(unittest.TestCase):
+    def setUp(self):
+        self.Tnp = np.array([[-0.02495988040066277, 0.01720436961811805,   0.9995404014027787, -1103.428193030075],
+                             [ 0.06813350186490005,   0.997556284701166, -0.01546883243273596, -35.93298768047541],
+                             [ -0.9973639407428014, 0.06771608759556018, -0.02607107950853105,  798.7780129474496],
+                             [                   0,                   0,                    0,                  1]])
+        self.poses = np.vstack((self.Tnp[:3].ravel(), np.linalg.inv(self.Tnp)[:3].ravel()))
+        self.points = np.array([[1, -1, 1],
+                                [2,  3, 4]], dtype=np.float64)
+
+    def test_transform_points_by_poses_async_success(self):
+        future = sp.transform_points_by_poses_async(self.poses, self.points)
+        self.assertIsInstance(future, concurrent.futures.Future)
+        self.assertTrue(np.allclose(future.result(), sp.transform_points_by_poses(self.poses, self.points)))
+
+        future = sp.transform_points_by_poses_async(self.poses, self.points, True)
+        self.assertTrue(np.allclose(future.result(), sp.transform_points_by_poses(self.poses, self.points, True)))
+
+    def test_invert_poses_async_success(self):
+        future = sp.invert_poses_async(self.poses)
+        self.assertTrue(np.allclose(future.result(), sp.invert_poses(self.poses)))
+
+        future = sp.invert_poses_async(self.poses[0])
+        self.assertEqual(future.result().shape, (12,))
+
+    def test_async_non_blocking_success(self):
+        future = sp.transform_points_by_poses_async(self.poses, self.points, block=False)
+        self.assertTrue(np.allclose(future.result(), sp.transform_points_by_poses(self.poses, self.points)))
+
+        future = sp.invert_poses_async(self.poses[0], block=False)
+        self.assertEqual(future.result().shape, (12,))
+
+    def test_await_future_success(self):
+        async def run():
+            return await asyncio.wrap_future(sp.invert_poses_async(self.poses))
+
+        self.assertTrue(np.allclose(asyncio.run(run()), sp.invert_poses(self.poses)))
+
+    def test_executor_success(self):
+        with sp.Executor(max_workers=2, max_queue_size=3) as executor:
+            self.assertEqual(executor.max_workers, 2)
+            self.assertEqual(executor.max_queue_size, 3)
+            futures = [executor.invert_poses(self.poses) for _ in range(20)]
+        for future in futures:
+            self.assertTrue(future.done())
+            self.assertTrue(np.allclose(future.result(), sp.invert_poses(self.poses)))
+
+    def test_executor_queue_full_failure(self):
+        # each task takes much longer than a submission
+        poses = np.tile(self.poses, (250, 1))
+        points = np.tile(self.points, (1000, 1))
+        with sp.Executor(max_workers=1, max_queue_size=1) as executor:
+            with pytest.raises(RuntimeError) as e:
+                for _ in range(100):
+                    executor.transform_points_by_poses(poses, points, block=False)
+            self.assertTrue('queue is full' in str(e.value))
+
+    def test_executor_shutdown_failure(self):
+        executor = sp.Executor()
+        executor.shutdown()
+        with pytest.raises(RuntimeError) as e:
+            executor.invert_poses(self.poses)
+        self.assertTrue('after shutdown' in str(e.value))
+
+    def _run_script(self, script):
+        # in a child process, a regression aborts the interpreter
+        proc = subprocess.run([sys.executable, '-c', textwrap.dedent(script)], capture_output=True, text=True, timeout=60)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+
+    def test_last_reference_dropped_by_worker_success(self):
+        self._run_script("""
+            import numpy as np
+            import sophuspy as sp
+
+            def submit():
+                executor = sp.Executor(1, 4)
+                future = executor.transform_points_by_poses(np.tile(np.eye(4)[:3].ravel(), (2000, 1)), np.ones((500, 3)))
+                future.add_done_callback(lambda f, executor=executor: None)
+
+            for _ in range(20):
+                submit()
+        """)
+
+    def test_shutdown_from_worker_success(self):
+        self._run_script("""
+            import numpy as np
+            import sophuspy as sp
+
+            executor = sp.Executor(1, 4)
+            future = executor.invert_poses(np.eye(4)[:3].ravel())
+            future.add_done_callback(lambda f: executor.shutdown())
+            future.result()
+            del executor, future
+        """)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'requires os.fork')
+    def test_async_after_fork_success(self):
+        self._run_script("""
+            import os
+            import numpy as np
+            import sophuspy as sp
+
+            pose = np.eye(4)[:3].ravel()
+            sp.invert_poses_async(pose).result()
+            pid = os.fork()
+            if 0 == pid:
+                try:
+                    ok = np.allclose(sp.invert_poses_async(pose).result(timeout=10), pose)
+                except Exception:
+                    ok = False
+                os._exit(0 if ok else 1)
+            _, status = os.waitpid(pid, 0)
+            assert 0 == os.waitstatus_to_exitcode(status)
+        """)
@@ -0,0 +1,195 @@
+import numpy as np
+import unittest
+import pytest
+
+import sophuspy as sp
+
+
+class TestTransformTree(unittest.TestCase):
+    def setUp(self):
+        self.T_map_odom = sp.SE3.exp(np.array([5, 0, 0, 0, 0, 1.]))
+        self.T_odom_base = sp.SE3.exp(np.array([0, 1, 0, 0.3, 0, 0.1]))
+        self.T_base_sensor = sp.SE3.exp(np.array([1, 2, 3, 0.1, 0.2, 0.3]))
+
+        self.tree = sp.TransformTree()
+        self.tree.set_transform('odom', 'map', self.T_map_odom)
+        self.tree.set_transform('base', 'odom', self.T_odom_base)
+        self.tree.set_transform('sensor', 'base', self.T_base_sensor)
+
+    def test_frames(self):
+        self.assertEqual(len(self.tree), 4)
+        self.assertEqual(set(self.tree.frames()), {'map', 'odom', 'base', 'sensor'})
+        self.assertTrue('base' in self.tree)
+        self.assertFalse(self.tree.has_frame('camera'))
+        self.assertEqual(self.tree.parent('sensor'), 'base')
+        self.assertIsNone(self.tree.parent('map'))
+
+    def test_lookup(self):
+        T = self.T_map_odom * self.T_odom_base * self.T_base_sensor
+        self.assertTrue(np.allclose(self.tree.lookup('map', 'sensor').matrix(), T.matrix()))
+        self.assertTrue(np.allclose(self.tree.lookup('sensor', 'map').matrix(), T.inverse().matrix()))
+        self.assertTrue(np.allclose(self.tree.lookup('base', 'base').matrix(), np.eye(4)))
+
+    def test_lookup_after_update(self):
+        self.tree.lookup('map', 'sensor')
+        self.tree.set_transform('base', 'odom', self.T_base_sensor)
+        T = self.T_map_odom * self.T_base_sensor * self.T_base_sensor
+        self.assertTrue(np.allclose(self.tree.lookup('map', 'sensor').matrix(), T.matrix()))
+
+    def test_update_invalidates_subtree(self):
+        # camera and lidar are siblings below base
+        T_base_camera = sp.SE3.exp(np.array([0, 0, 1, 0, 0.5, 0]))
+        T_base_lidar = sp.SE3.exp(np.array([0, 0, 2, 0.2, 0, 0]))
+        self.tree.set_transform('camera', 'base', T_base_camera)
+        self.tree.set_transform('lidar', 'base', T_base_lidar)
+        T_map_base = self.T_map_odom * self.T_odom_base
+
+        # fill the cache
+        for frame in ('sensor', 'camera', 'lidar'):
+            self.tree.lookup('map', frame)
+
+        T_base_camera = sp.SE3.exp(np.array([1, 0, 0, 0, 0, 0.2]))
+        self.tree.set_transform('camera', 'base', T_base_camera)
+        self.assertTrue(np.allclose(self.tree.lookup('map', 'camera').matrix(), (T_map_base * T_base_camera).matrix()))
+        self.assertTrue(np.allclose(self.tree.lookup('map', 'lidar').matrix(), (T_map_base * T_base_lidar).matrix()))
+
+        T_base_lidar = sp.SE3.exp(np.array([0, 3, 0, 0, 0.1, 0]))
+        self.tree.set_transform('lidar', 'base', T_base_lidar)
+        self.assertTrue(np.allclose(self.tree.lookup('map', 'lidar').matrix(), (T_map_base * T_base_lidar).matrix()))
+        self.assertTrue(np.allclose(self.tree.lookup('map', 'camera').matrix(), (T_map_base * T_base_camera).matrix()))
+        self.assertTrue(np.allclose(self.tree.lookup('camera', 'lidar').matrix(),
+                                    (T_base_camera.inverse() * T_base_lidar).matrix()))
+        self.assertTrue(np.allclose(self.tree.lookup('map', 'sensor').matrix(),
+                                    (T_map_base * self.T_base_sensor).matrix()))
+
+        # updating an ancestor reaches every subtree below it
+        T_map_odom = sp.SE3.exp(np.array([0, 0, 0, 0, 0, -1.]))
+        self.tree.set_transform('odom', 'map', T_map_odom)
+        T_map_base = T_map_odom * self.T_odom_base
+        self.assertTrue(np.allclose(self.tree.lookup('map', 'camera').matrix(), (T_map_base * T_base_camera).matrix()))
+        self.assertTrue(np.allclose(self.tree.lookup('map', 'lidar').matrix(), (T_map_base * T_base_lidar).matrix()))
+
+    def test_deep_chain(self):
+        tree = sp.TransformTree()
+        T = sp.SE3.exp(np.array([1e-3, 0, 0, 0, 0, 0]))
+        for i in range(100000):
+            tree.set_transform(str(i + 1), str(i), T)
+        self.assertTrue(np.allclose(tree.lookup('0', '100000').translation(), [100., 0, 0]))
+
+        tree.set_transform('1', '0', sp.SE3())
+        self.assertTrue(np.allclose(tree.lookup('0', '100000').translation(), [99.999, 0, 0]))
+
+    def test_reparent_then_stamped(self):
+        self.tree.set_transform('sensor', 'base', sp.SE3(), 1.0)
+        self.tree.set_transform('sensor', 'base', sp.SE3(), 2.0)
+        self.tree.lookup('map', 'sensor')
+
+        # the buffer of the old edge is dropped
+        T_odom_sensor = sp.SE3.exp(np.array([0, 0, 1, 0, 0, 0.5]))
+        self.tree.set_transform('sensor', 'odom', T_odom_sensor, 5.0)
+        self.assertEqual(self.tree.parent('sensor'), 'odom')
+        T = self.T_map_odom * T_odom_sensor
+        self.assertTrue(np.allclose(self.tree.lookup('map', 'sensor').matrix(), T.matrix()))
+        self.assertTrue(np.allclose(self.tree.lookup('map', 'sensor', 5.0).matrix(), T.matrix()))
+        with pytest.raises(ValueError):
+            self.tree.lookup('map', 'sensor', 1.5)
+
+    def test_replace_latest_stamp(self):
+        T1 = sp.SE3.exp(np.array([1, 0, 0, 0, 0, 0.]))
+        T2 = sp.SE3.exp(np.array([0, 2, 0, 0, 0, 0.]))
+        self.tree.set_transform('sensor', 'base', sp.SE3(), 1.0)
+        self.tree.set_transform('sensor', 'base', T1, 2.0)
+        self.tree.lookup('map', 'sensor')
+
+        self.tree.set_transform('sensor', 'base', T2, 2.0)
+        T_map_base = self.T_map_odom * self.T_odom_base
+        self.assertTrue(np.allclose(self.tree.lookup('map', 'sensor').matrix(), (T_map_base * T2).matrix()))
+        self.assertTrue(np.allclose(self.tree.lookup('base', 'sensor', 2.0).matrix(), T2.matrix()))
+
+        # an older stamp leaves the latest pose
+        self.tree.set_transform('sensor', 'base', T1, 1.0)
+        self.assertTrue(np.allclose(self.tree.lookup('map', 'sensor').matrix(), (T_map_base * T2).matrix()))
+        self.assertTrue(np.allclose(self.tree.lookup('base', 'sensor', 1.0).matrix(), T1.matrix()))
+
+    def test_reparent(self):
+        self.tree.lookup('map', 'sensor')
+        self.tree.set_transform('sensor', 'odom', self.T_base_sensor)
+        self.assertEqual(self.tree.parent('sensor'), 'odom')
+        T = self.T_map_odom * self.T_base_sensor
+        self.assertTrue(np.allclose(self.tree.lookup('map', 'sensor').matrix(), T.matrix()))
+
+    def test_lookup_stamped(self):
+        T_map_odom = sp.SE3.exp(np.array([2, 0, 0, 0, 0, 1.]))
+        self.tree.set_transform('odom', 'map', sp.SE3(), 1.0)
+        self.tree.set_transform('odom', 'map', T_map_odom, 3.0)
+
+        T = self.tree.lookup('map', 'odom', 2.0)
+        self.assertTrue(np.allclose(T.matrix(), sp.SE3.exp(0.5 * T_map_odom.log()).matrix()))
+        self.assertTrue(np.allclose(self.tree.lookup('map', 'odom', 1.0).matrix(), np.eye(4)))
+        self.assertTrue(np.allclose(self.tree.lookup('map', 'odom').matrix(), T_map_odom.matrix()))
+
+        # edges below the common ancestor only
+        T = self.tree.lookup('odom', 'sensor', 10.0)
+        self.assertTrue(np.allclose(T.matrix(), (self.T_odom_base * self.T_base_sensor).matrix()))
+
+    def test_set_transform_non_finite_stamp_failure(self):
+        for stamp in (np.nan, np.inf, -np.inf):
+            with pytest.raises(ValueError) as e:
+                self.tree.set_transform('odom', 'map', sp.SE3(), stamp)
+            self.assertTrue('not finite' in str(e.value))
+
+        # the edge is left static
+        self.assertTrue(np.allclose(self.tree.lookup('map', 'odom', 0.0).matrix(), self.T_map_odom.matrix()))
+
+    def test_lookup_non_finite_stamp_failure(self):
+        self.tree.set_transform('odom', 'map', sp.SE3(), 1.0)
+        self.tree.set_transform('odom', 'map', sp.SE3(), 3.0)
+        for stamp in (np.nan, np.inf):
+            with pytest.raises(ValueError) as e:
+                self.tree.lookup('map', 'sensor', stamp)
+            self.assertTrue('not finite' in str(e.value))
+
+            with pytest.raises(ValueError) as e:
+                self.tree.lookup_poses(['map'], ['sensor'], stamp)
+            self.assertTrue('not finite' in str(e.value))
+
+    def test_buffer_size(self):
+        tree = sp.TransformTree(buffer_size=2)
+        self.assertEqual(tree.buffer_size, 2)
+        for stamp in range(3):
+            tree.set_transform('b', 'a', sp.SE3(), float(stamp))
+        tree.lookup('a', 'b', 1.5)
+        with pytest.raises(ValueError) as e:
+            tree.lookup('a', 'b', 0.5)
+        self.assertTrue('outside the buffer' in str(e.value))
+
+    def test_lookup_poses(self):
+        poses = self.tree.lookup_poses(['map', 'sensor', 'odom'], ['sensor', 'map', 'base'])
+        self.assertEqual(poses.shape, (3, 12))
+        self.assertTrue(np.allclose(poses[0], self.tree.lookup('map', 'sensor').matrix3x4().ravel()))
+        self.assertTrue(np.allclose(poses[1], self.tree.lookup('sensor', 'map').matrix3x4().ravel()))
+
+        poses = self.tree.lookup_poses(['map'], ['sensor'], 0.0)
+        self.assertTrue(np.allclose(poses[0], self.tree.lookup('map', 'sensor').matrix3x4().ravel()))
+
+        points = np.array([[1., 2., 3.]])
+        new_points = sp.transform_points_by_poses(poses, points)
+        self.assertTrue(np.allclose(new_points[0], self.tree.lookup('map', 'sensor') * points[0]))
+
+    def test_failure(self):
+        with pytest.raises(ValueError) as e:
+            self.tree.lookup('map', 'camera')
+        self.assertTrue('unknown frame' in str(e.value))
+
+        self.tree.set_transform('camera', 'rig', sp.SE3())
+        with pytest.raises(ValueError) as e:
+            self.tree.lookup('map', 'camera')
+        self.assertTrue('not connected' in str(e.value))
+
+        with pytest.raises(ValueError) as e:
+            self.tree.set_transform('map', 'sensor', sp.SE3())
+        self.assertTrue('cycle' in str(e.value))
+
+        with pytest.raises(ValueError) as e:
+            self.tree.lookup_poses(['map'], [])
+        self.assertTrue('same length' in str(e.value))
@@ -0,0 +1,109 @@
+import numpy as np
+import unittest
+
+import sophuspy as sp
+
+
+class TestUfunc(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.T = np.stack([sp.SE3.exp(xi).matrix() for xi in rng.normal(size=(6, 6))]).reshape(2, 3, 4, 4)
+        self.R = self.T[..., :3, :3]
+        self.T2 = np.stack([sp.SE2.exp(xi).matrix() for xi in rng.normal(size=(4, 3))])
+        self.pts = rng.normal(size=(2, 3, 5, 3))
+
+    def test_signature(self):
+        self.assertEqual(sp.ufunc.se3_compose.signature, '(4,4),(4,4)->(4,4)')
+        self.assertEqual(sp.ufunc.se3_act.signature, '(4,4),(3)->(3)')
+        self.assertEqual(sp.ufunc.so2_log.signature, '(2,2)->()')
+
+    def test_se3_compose_broadcast(self):
+        A, B = self.T[:, None], self.T[None, :]
+        C = sp.ufunc.se3_compose(A, B)
+        self.assertEqual(C.shape, (2, 2, 3, 4, 4))
+        self.assertTrue(np.allclose(C, A @ B))
+
+    def test_se3_act_broadcast(self):
+        new_pts = sp.ufunc.se3_act(self.T[:, :, None], self.pts)
+        ans = np.einsum('...ij,...j->...i', self.R[:, :, None], self.pts) + self.T[:, :, None, :3, 3]
+        self.assertEqual(new_pts.shape, (2, 3, 5, 3))
+        self.assertTrue(np.allclose(new_pts, ans))
+
+    def test_se3_inverse_strided(self):
+        T = np.asfortranarray(self.T[:, ::-1])
+        self.assertTrue(np.allclose(sp.ufunc.se3_inverse(T), np.linalg.inv(T)))
+
+    def test_se3_log_exp(self):
+        xi = sp.ufunc.se3_log(self.T)
+        self.assertEqual(xi.shape, (2, 3, 6))
+        self.assertTrue(np.allclose(xi[1, 2], sp.SE3(self.T[1, 2]).log()))
+        self.assertTrue(np.allclose(sp.ufunc.se3_exp(xi), self.T))
+
+    def test_so3(self):
+        self.assertTrue(np.allclose(sp.ufunc.so3_compose(self.R, self.R), self.R @ self.R))
+        self.assertTrue(np.allclose(sp.ufunc.so3_inverse(self.R), np.swapaxes(self.R, -1, -2)))
+        self.assertTrue(np.allclose(sp.ufunc.so3_act(self.R, self.pts[:, :, 0]),
+                                    np.einsum('...ij,...j->...i', self.R, self.pts[:, :, 0])))
+        self.assertTrue(np.allclose(sp.ufunc.so3_exp(sp.ufunc.so3_log(self.R)), self.R))
+
+    def test_se2_so2(self):
+        T = self.T2
+        self.assertTrue(np.allclose(sp.ufunc.se2_compose(T, T), T @ T))
+        self.assertTrue(np.allclose(sp.ufunc.se2_inverse(T), np.linalg.inv(T)))
+        self.assertTrue(np.allclose(sp.ufunc.se2_act(T, [1, 2]), T[:, :2, :2] @ [1, 2] + T[:, :2, 2]))
+        self.assertTrue(np.allclose(sp.ufunc.se2_exp(sp.ufunc.se2_log(T)), T))
+
+        theta = np.linspace(-3, 3, 7)
+        R = sp.ufunc.so2_exp(theta)
+        self.assertEqual(R.shape, (7, 2, 2))
+        self.assertTrue(np.allclose(sp.ufunc.so2_log(R), theta))
+        self.assertTrue(np.allclose(sp.ufunc.so2_compose(R, sp.ufunc.so2_inverse(R)), np.eye(2)))
+        self.assertTrue(np.allclose(sp.ufunc.so2_act(R, [1, 0]), np.stack((np.cos(theta), np.sin(theta)), -1)))
+
+    def test_out(self):
+        out = np.empty((4, 4, 2, 3)).transpose(2, 3, 0, 1)
+        res = sp.ufunc.se3_compose(self.T, self.T, out=out)
+        self.assertIs(res, out)
+        self.assertTrue(np.allclose(out, self.T @ self.T))
+
+    def test_cast_and_empty(self):
+        self.assertEqual(sp.ufunc.se3_compose(np.eye(4, dtype=np.float32), np.eye(4)).dtype, np.float64)
+        self.assertTrue(np.allclose(sp.ufunc.so3_act(np.eye(3, dtype=int), [1, 2, 3]), [1, 2, 3]))
+        self.assertEqual(sp.ufunc.se3_inverse(np.zeros((0, 4, 4))).shape, (0, 4, 4))
+
+    def test_log_invalid_nan(self):
+        with np.errstate(invalid='ignore'):
+            for log, n in ((sp.ufunc.so2_log, 2), (sp.ufunc.se2_log, 3), (sp.ufunc.so3_log, 3), (sp.ufunc.se3_log, 4)):
+                self.assertTrue(np.isnan(log(np.full((n, n), np.nan))).all())
+                self.assertTrue(np.isnan(log(np.zeros((n, n)))).all())
+                self.assertTrue(np.isnan(log(2 * np.eye(n))).all())
+
+            # reflection
+            R = np.diag([1., 1., -1.])
+            self.assertTrue(np.isnan(sp.ufunc.so3_log(R)).all())
+
+            # only the invalid element is NaN
+            T = self.T.copy()
+            T[0, 0, :3, :3] = 0
+            xi = sp.ufunc.se3_log(T)
+            self.assertTrue(np.isnan(xi[0, 0]).all())
+            self.assertTrue(np.allclose(xi[1], sp.ufunc.se3_log(self.T[1])))
+
+    def test_exp_invalid_nan(self):
+        with np.errstate(invalid='ignore', over='ignore'):
+            for exp, n, m in ((sp.ufunc.so2_exp, 1, 2), (sp.ufunc.se2_exp, 3, 3),
+                              (sp.ufunc.so3_exp, 3, 3), (sp.ufunc.se3_exp, 6, 4)):
+                for value in (np.nan, np.inf, -np.inf):
+                    x = np.full(n, value).squeeze()
+                    self.assertTrue(np.isnan(exp(x)).all())
+                    self.assertEqual(exp(x).shape, (m, m))
+
+            # theta^2 overflows, only that element is NaN
+            R = sp.ufunc.so3_exp([[0, 0, .1], [1e200, 0, 0]])
+            self.assertTrue(np.isnan(R[1]).all())
+            self.assertTrue(np.allclose(R[0], sp.SO3.exp(np.array([0, 0, .1])).matrix()))
+            self.assertTrue(np.isnan(sp.ufunc.se3_exp([0, 0, 0, 1e200, 0, 0])).all())
+
+    def test_log_float32(self):
+        R = self.R.astype(np.float32)
+        self.assertTrue(np.allclose(sp.ufunc.so3_log(R), sp.ufunc.so3_log(self.R), atol=1e-5))